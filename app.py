@@ -1,11 +1,12 @@
 import streamlit as st
 import pandas as pd
 import os
+import json
 import numpy as np
 
 # --- Import custom modules ---
 try:
-    from src.modeling import load_and_process_data, create_similarity_matrix, recommend_papers
+    from src.modeling import load_and_process_data, add_date_features, create_similarity_matrix, recommend_papers, save_embeddings, load_embeddings
     from src.exceptions import CustomException
     from src.utils.logger import logging
 except ImportError as e:
@@ -16,34 +17,221 @@ except ImportError as e:
 
 # ----------------------------------------------------------------------
 # 1. Data Loading and Modeling (Caching for efficiency)
-# Use @st.cache_data to ensure this expensive function runs only once.
+# Use @st.cache_resource to ensure this expensive function runs only once.
 # ----------------------------------------------------------------------
 
-@st.cache_data
-def load_and_process_assets(data_filepath='data/raw_papers.csv'):
+# Raw data: Parquet written by data ingestion, or the bundled CSV
+RAW_PARQUET_FILE = os.path.join('data', 'raw_papers.parquet')
+RAW_CSV_FILE = os.path.join('data', 'raw_papers.csv')
+
+# Processed assets persisted after the first run, reused on later starts.
+# The JSON sidecar records which raw file (and version of it) they were built from,
+# and is written last, so assets without a matching sidecar are never trusted.
+PROCESSED_DATA_FILE = os.path.join('data', 'processed.parquet')
+EMBEDDINGS_FILE = os.path.join('data', 'embeddings.npz')
+PROCESSED_META_FILE = os.path.join('data', 'processed_meta.json')
+
+# Bump whenever the persisted DataFrame / embeddings layout changes
+# (2: 'summary' is kept instead of 'combined_text')
+PROCESSED_ASSETS_VERSION = 2
+
+# Columns the recommender and the UI read from the processed DataFrame
+REQUIRED_COLUMNS = ['id', 'title', 'summary', 'authors', 'published', 'published_dt']
+
+def processed_assets_signature(data_filepath):
+    """
+    Identifies the raw data file the processed assets are built from.
+    """
+    return {
+        'version': PROCESSED_ASSETS_VERSION,
+        'source': os.path.abspath(data_filepath),
+        'source_mtime': os.path.getmtime(data_filepath)
+    }
+
+def load_persisted_assets(data_filepath):
+    """
+    Returns the persisted (DataFrame, embeddings) if they were built from the current
+    raw data file with the current asset version, otherwise None.
+    """
+    if not (os.path.exists(data_filepath) and os.path.exists(PROCESSED_META_FILE)):
+        return None
+
+    try:
+        with open(PROCESSED_META_FILE) as f:
+            if json.load(f) != processed_assets_signature(data_filepath):
+                logging.info("Persisted assets are stale, rebuilding them.")
+                return None
+
+        processed_df = pd.read_parquet(PROCESSED_DATA_FILE)
+        missing_columns = [c for c in REQUIRED_COLUMNS if c not in processed_df.columns]
+        if missing_columns:
+            raise ValueError(f"missing columns {missing_columns}")
+
+        embeddings = load_embeddings(EMBEDDINGS_FILE)
+        if embeddings.shape[0] != len(processed_df):
+            raise ValueError(f"{embeddings.shape[0]} embeddings for {len(processed_df)} papers")
+
+        return add_date_features(processed_df), embeddings
+
+    except Exception as e:
+        logging.warning(f"Could not load persisted assets, rebuilding them: {e}")
+        return None
+
+def persist_assets(data_filepath, processed_df, embeddings):
     """
-    Loads and processes data, and creates the similarity matrix.
-    This function will run only once.
+    Saves the processed assets for the next start. Each file is written to a temporary
+    path and moved into place, and the sidecar is written last.
+    The app still works if this fails.
+    """
+    try:
+        # invalidate the old assets first, so a partial write is never trusted
+        if os.path.exists(PROCESSED_META_FILE):
+            os.remove(PROCESSED_META_FILE)
+
+        tmp_data_file = PROCESSED_DATA_FILE + '.tmp'
+        processed_df.drop(columns=['days_since_pub', 'date_boost']).to_parquet(tmp_data_file)
+        os.replace(tmp_data_file, PROCESSED_DATA_FILE)
+
+        # numpy / scipy append '.npz' to paths without it
+        tmp_embeddings_file = EMBEDDINGS_FILE + '.tmp.npz'
+        save_embeddings(tmp_embeddings_file, embeddings)
+        os.replace(tmp_embeddings_file, EMBEDDINGS_FILE)
+
+        tmp_meta_file = PROCESSED_META_FILE + '.tmp'
+        with open(tmp_meta_file, 'w') as f:
+            json.dump(processed_assets_signature(data_filepath), f)
+        os.replace(tmp_meta_file, PROCESSED_META_FILE)
+
+        logging.info(f"Persisted processed assets to {PROCESSED_DATA_FILE} and {EMBEDDINGS_FILE}.")
+    except Exception as e:
+        logging.warning(f"Could not persist processed assets: {e}")
+
+@st.cache_resource
+def load_and_process_assets(data_filepath=None):
+    """
+    Loads and processes data, and creates the normalized paper embeddings.
+    This function will run only once; the returned assets are shared by reference
+    across reruns and sessions (not copied), so callers must not modify them.
     """
     logging.info("Starting asset loading: Data & Model.")
     
-    if not os.path.exists(data_filepath):
-        # Raise an error if data is missing (crucial for deployment)
-        raise CustomException(f"Data file not found at {data_filepath}. Please run data ingestion.")
+    if data_filepath is None:
+        data_filepath = RAW_PARQUET_FILE if os.path.exists(RAW_PARQUET_FILE) else RAW_CSV_FILE
+    
+    persisted_assets = load_persisted_assets(data_filepath)
+    if persisted_assets is not None:
+        # Warm start: skip CSV parsing, datetime parsing and TF-IDF / SVD fitting
+        logging.info(f"Loaded persisted assets from {PROCESSED_DATA_FILE} and {EMBEDDINGS_FILE}.")
+        processed_df, embeddings = persisted_assets
+    
+    else:
+        if not os.path.exists(data_filepath):
+            # Raise an error if data is missing (crucial for deployment)
+            raise CustomException(f"Data file not found at {data_filepath}. Please run data ingestion.")
 
-    # 1. Load and process the data
-    processed_df = load_and_process_data(data_filepath)
+        # 1. Load and process the data
+        processed_df = load_and_process_data(data_filepath)
+        
+        # 2. Create the normalized embeddings (similarity rows are computed per query)
+        embeddings = create_similarity_matrix(processed_df)
+        
+        # Persist both for the next start
+        persist_assets(data_filepath, processed_df, embeddings)
     
-    # 2. Create the similarity matrix
-    sim_matrix = create_similarity_matrix(processed_df)
+    # 3. Title -> row position lookup (rows of the embeddings are positional)
+    # (the title list is also returned for the selectbox, so reruns do not rebuild it)
+    paper_titles = processed_df['title'].tolist()
+    title_to_idx = {}
+    for i, title in enumerate(paper_titles):
+        title_to_idx.setdefault(title, i)
     
-    logging.info("Assets loaded and Similarity Matrix created successfully.")
-    return processed_df, sim_matrix
+    logging.info("Assets loaded and normalized embeddings created successfully.")
+    return processed_df, embeddings, title_to_idx, paper_titles
+
+@st.cache_data(show_spinner=False)
+def _cached_recommend(selected_title, top_n=5):
+    """
+    Returns the recommendations for a paper title.
+    Repeated queries for the same title are served from the cache.
+    """
+    df, embeddings, title_to_idx, _ = load_and_process_assets()
+    
+    selected_index = title_to_idx[selected_title]
+    return recommend_papers(df, embeddings, selected_index, top_n=top_n)
 
 # ----------------------------------------------------------------------
 # 2. Streamlit UI (Web Application Interface)
 # ----------------------------------------------------------------------
 
+def show_recommendations(df, title_to_idx, selected_title):
+    """
+    Renders the selected paper and its recommendations.
+    """
+    with st.spinner('Generating recommendations... This may take a moment to load the model.'):
+
+        # Call the model function (cached per selected title)
+        recommendations_df = _cached_recommend(selected_title, top_n=5)
+
+        # --- Selected Paper Detail (Better UI for Input) ---
+
+        # Get details for the selected paper
+        selected_paper_data = df.iloc[title_to_idx[selected_title]]
+        selected_authors = selected_paper_data['authors']
+        selected_published = selected_paper_data['published']
+        selected_summary = selected_paper_data['summary']
+
+        # Display the selected paper in a clean expander/box
+        with st.expander(f"📖 **Selected Paper Details: {selected_title}**", expanded=False):
+            st.markdown(f"**Authors:** _{selected_authors}_")
+            st.markdown(f"**Published Date:** _{selected_published}_")
+            st.markdown("---")
+            st.markdown(f"**Summary:** {selected_summary}")
+
+        st.markdown("---")
+        st.subheader(f"✅ Top 5 Recommendations")
+        st.write(f"The best matches for **{selected_title}** are listed below:")
+
+        # --- Display Results Loop (Cleaner UI) ---
+
+        # Loop through the recommendations and display them beautifully
+        for index, row in recommendations_df.iterrows():
+            title = row['title']
+            authors = row['authors']
+            published = row['published']
+            hybrid_score = f"{row['Hybrid Score']:.4f}"
+            summary_text = row['summary']
+            paper_id = row['id']
+            arxiv_link = f"https://arxiv.org/abs/{paper_id}"
+
+            # Use a container for visual separation of each recommendation block
+            with st.container(border=True):
+
+                # 1. Row for Title and Score
+                title_col, score_col = st.columns([4, 1])
+
+                with title_col:
+                    st.markdown(f"#### 📄 {title}")
+
+                with score_col:
+                    # Display score prominently as a metric
+                    st.metric(label="Hybrid Score", value=hybrid_score)
+
+                # 2. Row for Metadata (Authors, Date, Link)
+                meta_col1, meta_col2 = st.columns([1, 2])
+
+                with meta_col1:
+                    st.markdown(f"**Published:** {published}")
+                    st.markdown(f"**ArXiv ID:** `{paper_id}`")
+
+                with meta_col2:
+                    st.markdown(f"**Authors:** _{authors}_")
+                    # Direct link to the source
+                    st.markdown(f"[**View Full Paper/PDF on ArXiv ↗️**]({arxiv_link})")
+
+                # 3. Summary Expander
+                with st.expander("Expand to Read Abstract"):
+                    st.markdown(f"**Abstract:** {summary_text}")
+
 def main():
     st.set_page_config(
         page_title="ArXiv Paper Recommender",
@@ -58,11 +246,11 @@ def main():
     
     try:
         # Load data and matrix from the cached function
-        df, cosine_sim = load_and_process_assets()
+        df, embeddings, title_to_idx, paper_titles = load_and_process_assets()
         
     except CustomException as e:
         st.error(f"CRITICAL ERROR: {e}")
-        st.info("Please ensure the data ingestion step was run successfully and 'data/raw_papers.csv' exists.")
+        st.info("Please ensure the data ingestion step was run successfully and 'data/raw_papers.parquet' (or 'data/raw_papers.csv') exists.")
         return # Stop the app if data cannot be loaded
 
     # --- Input Section ---
@@ -70,8 +258,6 @@ def main():
     # Use columns to make the input layout cleaner
     input_col, button_col = st.columns([4, 1])
     
-    paper_titles = df['title'].tolist()
-    
     with input_col:
         selected_title = st.selectbox(
             "Select a paper to get recommendations:",
@@ -93,77 +279,8 @@ def main():
     # --- Recommendation Logic and Display ---
     if st.session_state.recommendations_generated:
         if selected_title:
-            with st.spinner('Generating recommendations... This may take a moment to load the model.'):
-                
-                # Find the index of the selected title
-                selected_index = df[df['title'] == selected_title].index[0]
-                
-                # Call the model function
-                recommendations_df = recommend_papers(df, cosine_sim, selected_index, top_n=5)
-                
-                # --- Selected Paper Detail (Better UI for Input) ---
-                
-                # Get details for the selected paper
-                selected_paper_data = df[df['title'] == selected_title].iloc[0]
-                selected_authors = selected_paper_data['authors']
-                selected_published = selected_paper_data['published']
-                selected_summary = selected_paper_data['combined_text']
-                
-                # Display the selected paper in a clean expander/box
-                with st.expander(f"📖 **Selected Paper Details: {selected_title}**", expanded=False):
-                    st.markdown(f"**Authors:** _{selected_authors}_")
-                    st.markdown(f"**Published Date:** _{selected_published}_")
-                    st.markdown("---")
-                    st.markdown(f"**Summary:** {selected_summary}")
-                
-                st.markdown("---")
-                st.subheader(f"✅ Top 5 Recommendations")
-                st.write(f"The best matches for **{selected_title}** are listed below:")
-
-                # --- Display Results Loop (Cleaner UI) ---
-                
-                # Loop through the recommendations and display them beautifully
-                for index, row in recommendations_df.iterrows():
-                    title = row['title']
-                    authors = row['authors']
-                    published = row['published']
-                    hybrid_score = f"{row['Hybrid Score']:.4f}"
-                    
-                    paper_data = df[df['title'] == title].iloc[0]
-                    summary_text = paper_data['combined_text'] 
-                    paper_id = paper_data['id']
-                    arxiv_link = f"https://arxiv.org/abs/{paper_id}"
-
-                    # Use a container for visual separation of each recommendation block
-                    with st.container(border=True):
-                        
-                        # 1. Row for Title and Score
-                        title_col, score_col = st.columns([4, 1])
-                        
-                        with title_col:
-                            st.markdown(f"#### 📄 {title}")
-                        
-                        with score_col:
-                            # Display score prominently as a metric
-                            st.metric(label="Hybrid Score", value=hybrid_score)
-                        
-                        # 2. Row for Metadata (Authors, Date, Link)
-                        meta_col1, meta_col2 = st.columns([1, 2])
-                        
-                        with meta_col1:
-                            st.markdown(f"**Published:** {published}")
-                            st.markdown(f"**ArXiv ID:** `{paper_id}`")
-                        
-                        with meta_col2:
-                            st.markdown(f"**Authors:** _{authors}_")
-                            # Direct link to the source
-                            st.markdown(f"[**View Full Paper/PDF on ArXiv ↗️**]({arxiv_link})")
-
-                        # 3. Summary Expander
-                        with st.expander("Expand to Read Abstract"):
-                            st.markdown(f"**Abstract:** {summary_text}")
-                            
-            
+            show_recommendations(df, title_to_idx, selected_title)
+
         else:
             st.warning("Please select a paper title to generate recommendations.")
 
@@ -1,4 +1,5 @@
 import os
+import io
 import requests
 import xml.etree.ElementTree as ET
 import pandas as pd
@@ -8,7 +9,17 @@ from src.utils.logger import logging
 ARXIV_API_URL = "http://export.arxiv.org/api/query"
 QUERY = 'cat:cs.AI OR cat:cs.LG' 
 MAX_RESULTS = 500
-OUTPUT_FILE = os.path.join('data', 'raw_papers.csv')
+OUTPUT_FILE = os.path.join('data', 'raw_papers.parquet')
+
+# Atom tag names, built once instead of on every find()
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+ENTRY_TAG = ATOM_NS + 'entry'
+TITLE_TAG = ATOM_NS + 'title'
+SUMMARY_TAG = ATOM_NS + 'summary'
+PUBLISHED_TAG = ATOM_NS + 'published'
+ID_TAG = ATOM_NS + 'id'
+AUTHOR_TAG = ATOM_NS + 'author'
+NAME_TAG = ATOM_NS + 'name'
 
 class DataIngestion:
     def __init__ (self) :
@@ -39,27 +50,35 @@ class DataIngestion:
 
     def parse_arxiv_xml (self , xml_data:str) -> pd.DataFrame :
         logging.info("Starting XML parsing.")
-        data = []
+        # one list per column, the schema is known up front
+        ids, titles, summaries, published_dates, authors_list = [], [], [], [], []
 
         try : 
-            root = ET.fromstring(xml_data)
+            # stream the feed entry by entry instead of building the whole tree
+            for _, entry in ET.iterparse(io.BytesIO(xml_data.encode('utf-8')), events=('end',)):
+                if entry.tag != ENTRY_TAG:
+                    continue
 
-            for entry in root.findall('{http://www.w3.org/2005/Atom}entry'):
-                title = entry.find('{http://www.w3.org/2005/Atom}title').text.strip()
-                summary = entry.find('{http://www.w3.org/2005/Atom}summary').text.strip()
-                published = entry.find('{http://www.w3.org/2005/Atom}published').text.strip()
+                ids.append(entry.find(ID_TAG).text.split('/')[-1])
+                titles.append(entry.find(TITLE_TAG).text.strip())
+                summaries.append(entry.find(SUMMARY_TAG).text.strip())
+                # keep only 'YYYY-MM-DD', so the date is parsed with a fixed format below
+                published = entry.find(PUBLISHED_TAG)
+                published_dates.append(published.text.strip()[:10] if published is not None and published.text else None)
                 
-                authors = [author.find('{http://www.w3.org/2005/Atom}name').text for author in entry.findall('{http://www.w3.org/2005/Atom}author')]
+                authors = [author.find(NAME_TAG).text for author in entry.findall(AUTHOR_TAG)]
+                authors_list.append(', '.join(authors))
 
-                data.append({
-                    'id': entry.find('{http://www.w3.org/2005/Atom}id').text.split('/')[-1],
-                    'title': title,
-                    'summary': summary,
-                    'published': published,
-                    'authors': ', '.join(authors)
-                })
+                # free the parsed entry so memory does not grow with the feed
+                entry.clear()
             
-            df = pd.DataFrame(data) 
+            df = pd.DataFrame({
+                'id': pd.Series(ids, dtype=object),
+                'title': pd.Series(titles, dtype=object),
+                'summary': pd.Series(summaries, dtype=object),
+                'published': pd.to_datetime(published_dates, format='%Y-%m-%d', errors='coerce', cache=True),
+                'authors': pd.Series(authors_list, dtype=object)
+            })
             logging.info(f"Successfully parsed {len(df)} papers into DataFrame.")
             return df
     
@@ -71,11 +90,13 @@ class DataIngestion:
     def save_data (self, df: pd.DataFrame): 
         logging.info(f"Saving data to {OUTPUT_FILE}")
         try:
-            df.to_csv(OUTPUT_FILE, index=False)
+            # columnar + compressed, much cheaper to write and read back than CSV
+            df.to_parquet(OUTPUT_FILE, engine='pyarrow', compression='zstd', index=False)
             logging.info("Data saved successfully.")
-        except IOError as e:
+        # ImportError: pyarrow missing; ValueError / TypeError: pyarrow ArrowInvalid / ArrowTypeError
+        except (OSError, ImportError, ValueError, TypeError) as e:
             logging.error(f"File Save Failed: {e}")
-            raise CustomException(f"Error saving data to CSV: {e}")
+            raise CustomException(f"Error saving data to Parquet: {e}")
         
     def initiate_data_ingestion(self):
         
@@ -1,12 +1,16 @@
 import pandas as pd
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from datetime import datetime
+from sklearn.preprocessing import normalize
+from sklearn.decomposition import TruncatedSVD
+from scipy import sparse
 
 from src.exceptions import CustomException
 from src.utils.logger import logging
 
+# number of latent dimensions kept for the dense paper embeddings
+SVD_COMPONENTS = 256
+
 # ----------------------------------------------------------------------
 # 1. Data Loading and Processing
 # ----------------------------------------------------------------------
@@ -15,19 +19,29 @@ def load_and_process_data(filepath: str) -> pd.DataFrame:
     
     logging.info(f"Loading and processing data from {filepath}")
     try:
-        df = pd.read_csv(filepath)
-        
-        # combine 'title' and 'summary' 
-        df['combined_text'] = df['title'].fillna('') + ' ' + df['summary'].fillna('')
+        # data ingestion writes Parquet, the bundled dataset is CSV
+        if filepath.endswith('.parquet'):
+            df = pd.read_parquet(filepath)
+        else:
+            df = pd.read_csv(filepath)
         
-        df.drop('summary', axis=1, inplace=True)
+        # 'summary' is kept for display; the combined text is only built for TF-IDF fitting
+        df['title'] = df['title'].fillna('')
+        df['summary'] = df['summary'].fillna('')
         
-        df.dropna(subset=['combined_text', 'published'], inplace=True)
+        df.dropna(subset=['published'], inplace=True)
         
         # change 'published' coloumn to datetime obj 
-        df['published_dt'] = pd.to_datetime(df['published'], errors='coerce')
+        if pd.api.types.is_datetime64_any_dtype(df['published']):
+            # already parsed during ingestion (Parquet), keep a plain date for display
+            df['published_dt'] = df['published']
+            df['published'] = df['published_dt'].dt.date
+        else:
+            df['published_dt'] = pd.to_datetime(df['published'], errors='coerce')
         df.dropna(subset=['published_dt'], inplace=True)
         
+        df = add_date_features(df)
+        
         logging.info(f"Data processing complete. {len(df)} valid papers remaining.")
         return df
     
@@ -38,68 +52,110 @@ def load_and_process_data(filepath: str) -> pd.DataFrame:
         logging.error(f"Error during data loading/processing: {e}")
         raise CustomException(f"Error in data processing: {e}")
 
+# Adds 'days_since_pub' and 'date_boost' relative to today.
+# Kept separate so a persisted DataFrame can refresh them without reprocessing.
+def add_date_features(df: pd.DataFrame) -> pd.DataFrame:
+    
+    # days since publication, computed once here instead of per paper per query
+    today = pd.Timestamp.now(tz=df['published_dt'].dt.tz).normalize()
+    df['days_since_pub'] = (today - df['published_dt'].dt.normalize()).dt.days.to_numpy(np.int32)
+    
+    # date boost is query independent, so it is computed once for the whole corpus
+    df['date_boost'] = calculate_date_boost(df['days_since_pub'].to_numpy()).astype(np.float32)
+    return df
+
 # ----------------------------------------------------------------------
 # 2. Core ML Modeling - TF-IDF and Cosine Similarity
 # ----------------------------------------------------------------------
 
-def create_similarity_matrix(df: pd.DataFrame):
+# Returns L2-normalized paper embeddings: a dense float32 LSA matrix (TF-IDF + TruncatedSVD),
+# or, for degenerate corpora only, the normalized sparse TF-IDF matrix.
+# Cosine similarity is then a dot product of rows, computed per query in recommend_papers.
+def create_similarity_matrix(df: pd.DataFrame, n_components: int = SVD_COMPONENTS):
     
-    logging.info("Creating TF-IDF vectors and Cosine Similarity matrix...")
+    logging.info("Creating normalized TF-IDF / SVD embeddings for Cosine Similarity...")
     
     tfidf = TfidfVectorizer(
         stop_words='english', 
         ngram_range=(1, 2),   
-        min_df=3              
+        min_df=3,
+        dtype=np.float32      # half the memory traffic of the float64 default
     )
     
-    tfidf_matrix = tfidf.fit_transform(df['combined_text'])
+    # combine 'title' and 'summary' only for fitting, so it is not kept in memory afterwards
+    tfidf_matrix = tfidf.fit_transform(df['title'] + ' ' + df['summary'])
+    
+    # TruncatedSVD needs fewer components than both documents and terms
+    n_components = min(n_components, tfidf_matrix.shape[0] - 1, tfidf_matrix.shape[1] - 1)
+    if n_components < 2:
+        # Degenerate-corpus fallback only: min_df=3 already rejects corpora of fewer than
+        # 3 papers, so this is reached only when at most 2 terms survive the vocabulary filter.
+        # L2-normalize rows once (keeps float32), cosine similarity = dot product of normalized rows
+        logging.info("Corpus too small for SVD, using the sparse TF-IDF matrix.")
+        return normalize(tfidf_matrix, norm='l2', copy=False)
     
-    cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
+    # dense row-major float32 embeddings, so a query is a single BLAS matrix-vector product
+    svd = TruncatedSVD(n_components=n_components, random_state=42)
+    # C-contiguous float32, so `embeddings @ row` dispatches straight to BLAS sgemv without a copy
+    embeddings = np.ascontiguousarray(normalize(svd.fit_transform(tfidf_matrix)), dtype=np.float32)
     
-    logging.info("Similarity matrix successfully created.")
-    return cosine_sim
+    logging.info(f"Normalized {n_components}-dimensional SVD embeddings successfully created.")
+    return embeddings
+
+# Embeddings are persisted as .npz: sparse matrices via scipy, dense arrays under 'embeddings'
+def save_embeddings(filepath: str, embeddings) -> None:
+    
+    if sparse.issparse(embeddings):
+        sparse.save_npz(filepath, embeddings)
+    else:
+        np.savez(filepath, embeddings=embeddings)
+
+def load_embeddings(filepath: str):
+    
+    with np.load(filepath) as npz:
+        if 'embeddings' in npz.files:
+            return np.ascontiguousarray(npz['embeddings'], dtype=np.float32)
+    return sparse.load_npz(filepath)
 
 # ----------------------------------------------------------------------
 # 3. Hybrid Logic and Recommendation Function
 # ----------------------------------------------------------------------
 
-def calculate_date_boost(published_dt: datetime) -> float:
+def calculate_date_boost(days_since_pub: np.ndarray) -> np.ndarray:
     
-    today = datetime.now().date()
-    pub_date = published_dt.date()
-    days_since_pub = (today - pub_date).days
-    
-    if days_since_pub > 1095:
-        return 0.0
-    
-    # (1 - (days_since_pub / 1095)) * 0.05
+    # (1 - (days_since_pub / 1095)) * 0.05, zero for papers older than 1095 days
     boost = (1 - (days_since_pub / 1095)) * 0.05
-    return max(0.0, boost)
+    return np.maximum(0.0, boost)
 
-def recommend_papers(df: pd.DataFrame, cosine_sim: np.ndarray, index: int, top_n: int = 10) -> pd.DataFrame:
+def recommend_papers(df: pd.DataFrame, embeddings, index: int, top_n: int = 10) -> pd.DataFrame:
     
     try:
-        sim_scores = list(enumerate(cosine_sim[index]))
+        # similarity row of the selected paper against the whole corpus
+        if sparse.issparse(embeddings):
+            # degenerate-corpus fallback (see create_similarity_matrix); the normal path is dense
+            # CSR matrix times the dense query row: a single SpMV, no transpose, dense result
+            sim_row = embeddings @ embeddings[index].toarray().ravel()
+        else:
+            sim_row = embeddings @ embeddings[index]
         
-        hybrid_scores = []
-        for i, score in sim_scores:
-            if i != index:
-                date_boost = calculate_date_boost(df.iloc[i]['published_dt'])
-                final_score = score + date_boost
-                hybrid_scores.append((i, final_score))
+        # add the precomputed date boost of every paper in one vectorized pass
+        final_scores = sim_row + df['date_boost'].to_numpy()
         
-        hybrid_scores = sorted(hybrid_scores, key=lambda x: x[1], reverse=True)
+        # the selected paper can never recommend itself
+        final_scores[index] = -np.inf
         
-        top_indices = [i[0] for i in hybrid_scores[:top_n]]
+        # O(N) selection of the top_n scores, then sort only those few
+        top_n = min(top_n, len(final_scores) - 1)
+        top_candidates = np.argpartition(-final_scores, top_n)[:top_n]
+        top_indices = top_candidates[np.argsort(-final_scores[top_candidates], kind='stable')]
         
         logging.info(f"Generated {len(top_indices)} hybrid recommendations for index {index}.")
         
-        recommendations_df = df.iloc[top_indices].copy()
-        
-        final_scores_map = {idx: score for idx, score in hybrid_scores}
-        recommendations_df['Hybrid Score'] = recommendations_df.index.map(lambda i: final_scores_map.get(i, 0))
+        # one columnar slice carrying every field the UI displays
+        recommendations_df = df.iloc[top_indices][['title', 'authors', 'published', 'summary', 'id']].copy()
+        recommendations_df['Hybrid Score'] = final_scores[top_indices]
         
-        return recommendations_df[['title', 'authors', 'published', 'Hybrid Score']]
+        return recommendations_df
     
     except IndexError:
         logging.error(f"Index {index} out of bounds for the DataFrame.")
@@ -116,12 +172,12 @@ if __name__ == '__main__':
     try:
         processed_df = load_and_process_data('data/raw_papers.csv')
         
-        sim_matrix = create_similarity_matrix(processed_df)
+        embeddings = create_similarity_matrix(processed_df)
         
         target_paper_title = processed_df.iloc[0]['title']
         logging.info(f"--- Recommendations for: {target_paper_title} ---")
         
-        recommendations = recommend_papers(processed_df, sim_matrix, 0, top_n=5)
+        recommendations = recommend_papers(processed_df, embeddings, 0, top_n=5)
         print(recommendations)
         
     except CustomException as e: